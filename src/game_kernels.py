@@ -0,0 +1,313 @@
+import random
+from typing import Tuple
+
+import numpy as np
+from numba import njit
+
+# Move directions understood by apply_move
+LEFT = 0
+RIGHT = 1
+UP = 2
+DOWN = 3
+
+# Typed constants so Numba keeps all bitboard arithmetic in uint64
+_ROW_MASK = np.uint64(0xFFFF)
+_NIBBLE_MASK = np.uint64(0xF)
+_ZERO = np.uint64(0)
+_ONE = np.uint64(1)
+_FOUR = np.uint64(4)
+_TWELVE = np.uint64(12)
+_SIXTEEN = np.uint64(16)
+_TWENTY_FOUR = np.uint64(24)
+_THIRTY_TWO = np.uint64(32)
+_FORTY_EIGHT = np.uint64(48)
+
+# Low nibble bits of cells that have a right-hand / lower neighbour
+_HORIZ_PAIRS = np.uint64(0x0111011101110111)
+_VERT_PAIRS = np.uint64(0x0000111111111111)
+
+
+def _reverse_row(row: np.ndarray) -> np.ndarray:
+    """Reverse the nibble order of 16-bit rows."""
+    return (
+        ((row & 0xF) << 12)
+        | ((row & 0xF0) << 4)
+        | ((row & 0xF00) >> 4)
+        | ((row & 0xF000) >> 12)
+    )
+
+
+def _move_line_left(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compress and merge 16-bit rows to the left, all rows at once.
+
+    Args:
+        rows: 1D array of rows, four nibbles with column 0 in the lowest nibble
+
+    Returns:
+        Tuple of (modified rows, score gained by each row)
+    """
+    shifts = np.arange(0, 16, 4, dtype=np.uint32)
+    ranks = (rows.astype(np.uint32)[:, None] >> shifts) & 0xF
+
+    # Remove zeros and compress, keeping the order of the remaining tiles
+    order = np.argsort(ranks == 0, axis=1, kind="stable")
+    line = np.take_along_axis(ranks, order, axis=1)
+    score = np.zeros(len(rows), dtype=np.uint32)
+
+    # Merge adjacent equal values (only once per move). Each merge shifts the
+    # rest of its row left, so the next pair never includes the merged tile.
+    # A nibble cannot hold anything beyond 2**15, so 32768s stay put.
+    for j in range(3):
+        merge = (line[:, j] != 0) & (line[:, j] == line[:, j + 1])
+        merge &= line[:, j] != 0xF
+        line[merge, j] += 1
+        score[merge] += np.uint32(1) << line[merge, j]
+        line[merge, j + 1 : 3] = line[merge, j + 2 :]
+        line[merge, 3] = 0
+
+    new_rows = (line << shifts).sum(axis=1).astype(np.uint16)
+    return new_rows, score
+
+
+def _unpack_col(row: np.ndarray) -> np.ndarray:
+    """Spread the nibbles of 16-bit rows down column 0 of a bitboard."""
+    row = row.astype(np.uint64)
+    return (
+        (row & 0xF)
+        | ((row & 0xF0) << 12)
+        | ((row & 0xF00) << 24)
+        | ((row & 0xF000) << 36)
+    )
+
+
+def _build_move_tables() -> Tuple[np.ndarray, ...]:
+    """Precompute the result and score of sliding every possible row."""
+    rows = np.arange(65536, dtype=np.uint16)
+    left_row, left_score = _move_line_left(rows)
+
+    # Sliding right is sliding the mirrored row left, then mirroring back
+    reverse = _reverse_row(rows)
+    right_row = reverse[left_row[reverse]]
+    right_score = left_score[reverse]
+
+    # Column results are stored already laid out as column 0, so vertical
+    # moves only need to transpose the board once on the way in
+    up_col = _unpack_col(left_row)
+    down_col = _unpack_col(right_row)
+    return left_row, left_score, right_row, right_score, up_col, down_col
+
+
+def _build_zobrist_keys() -> np.ndarray:
+    """Generate fixed random 64-bit keys indexed by [cell, rank]."""
+    rng = random.Random(0xBADC0FFEE)
+    keys = np.array(
+        [[rng.getrandbits(64) for _ in range(16)] for _ in range(16)],
+        dtype=np.uint64,
+    )
+    # Empty cells do not contribute, so an empty board hashes to 0
+    keys[:, 0] = 0
+    return keys
+
+
+# Row transition tables indexed by the 16-bit row being moved
+LEFT_ROW, LEFT_SCORE, RIGHT_ROW, RIGHT_SCORE, UP_COL, DOWN_COL = _build_move_tables()
+
+# Zobrist keys for hashing boards
+ZOBRIST = _build_zobrist_keys()
+
+
+@njit(cache=True, nogil=True)
+def transpose(board):
+    """Transpose a bitboard so that columns become rows."""
+    board = np.uint64(board)
+    a1 = board & np.uint64(0xF0F00F0FF0F00F0F)
+    a2 = board & np.uint64(0x0000F0F00000F0F0)
+    a3 = board & np.uint64(0x0F0F00000F0F0000)
+    a = a1 | (a2 << _TWELVE) | (a3 >> _TWELVE)
+    b1 = a & np.uint64(0xFF00FF0000FF00FF)
+    b2 = a & np.uint64(0x00FF00FF00000000)
+    b3 = a & np.uint64(0x00000000FF00FF00)
+    return b1 | (b2 >> _TWENTY_FOUR) | (b3 << _TWENTY_FOUR)
+
+
+@njit(cache=True, nogil=True)
+def _move_rows(board, rows, scores):
+    """Move every row of a bitboard using a row transition table."""
+    r0 = board & _ROW_MASK
+    r1 = (board >> _SIXTEEN) & _ROW_MASK
+    r2 = (board >> _THIRTY_TWO) & _ROW_MASK
+    r3 = (board >> _FORTY_EIGHT) & _ROW_MASK
+    new_board = (
+        np.uint64(rows[r0])
+        | (np.uint64(rows[r1]) << _SIXTEEN)
+        | (np.uint64(rows[r2]) << _THIRTY_TWO)
+        | (np.uint64(rows[r3]) << _FORTY_EIGHT)
+    )
+    score = (
+        np.uint64(scores[r0])
+        + np.uint64(scores[r1])
+        + np.uint64(scores[r2])
+        + np.uint64(scores[r3])
+    )
+    return new_board, score
+
+
+@njit(cache=True, nogil=True)
+def _move_cols(board, cols, scores):
+    """Move every column of a bitboard using a column transition table."""
+    transposed = transpose(board)
+    r0 = transposed & _ROW_MASK
+    r1 = (transposed >> _SIXTEEN) & _ROW_MASK
+    r2 = (transposed >> _THIRTY_TWO) & _ROW_MASK
+    r3 = (transposed >> _FORTY_EIGHT) & _ROW_MASK
+    new_board = (
+        cols[r0]
+        | (cols[r1] << _FOUR)
+        | (cols[r2] << np.uint64(8))
+        | (cols[r3] << _TWELVE)
+    )
+    score = (
+        np.uint64(scores[r0])
+        + np.uint64(scores[r1])
+        + np.uint64(scores[r2])
+        + np.uint64(scores[r3])
+    )
+    return new_board, score
+
+
+@njit(cache=True, nogil=True)
+def apply_move(board, direction):
+    """
+    Slide a bitboard in one direction.
+
+    Args:
+        board: Bitboard to move
+        direction: LEFT, RIGHT, UP or DOWN
+
+    Returns:
+        Tuple of (new bitboard, score gained from this move)
+    """
+    board = np.uint64(board)
+    if direction == LEFT:
+        return _move_rows(board, LEFT_ROW, LEFT_SCORE)
+    if direction == RIGHT:
+        return _move_rows(board, RIGHT_ROW, RIGHT_SCORE)
+    if direction == UP:
+        return _move_cols(board, UP_COL, LEFT_SCORE)
+    return _move_cols(board, DOWN_COL, RIGHT_SCORE)
+
+
+@njit(cache=True, nogil=True)
+def empty_mask(board):
+    """Return a mask with the low bit of every empty nibble set."""
+    board = np.uint64(board)
+    # OR each nibble's bits down into its lowest bit, then invert
+    folded = board | (board >> _ONE)
+    folded |= folded >> np.uint64(2)
+    return ~folded & np.uint64(0x1111111111111111)
+
+
+@njit(cache=True, nogil=True)
+def popcount(x):
+    """Count the set bits of a 64-bit integer."""
+    x = np.uint64(x)
+    x = x - ((x >> _ONE) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + (
+        (x >> np.uint64(2)) & np.uint64(0x3333333333333333)
+    )
+    x = (x + (x >> _FOUR)) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+@njit(cache=True, nogil=True)
+def count_empty(board):
+    """Return the number of empty cells on a bitboard."""
+    return popcount(empty_mask(board))
+
+
+@njit(cache=True, nogil=True)
+def spawn_tile(board, index, rank):
+    """
+    Place a tile in the index-th empty cell of a bitboard.
+
+    Args:
+        board: Bitboard to spawn into
+        index: Which empty cell to fill, counted from cell 0
+        rank: log2 of the tile value to place
+
+    Returns:
+        The new bitboard, or the unchanged board if it has no such cell
+    """
+    board = np.uint64(board)
+    mask = empty_mask(board)
+    # Drop the lowest empty cell until the requested one is lowest
+    for _ in range(index):
+        mask &= mask - _ONE
+    if mask == _ZERO:
+        return board
+    # Isolated low bit sits at nibble position, so scale it by the rank
+    return board | (np.uint64(rank) * (mask & (~mask + _ONE)))
+
+
+@njit(cache=True, nogil=True)
+def max_rank(board):
+    """Return log2 of the largest tile on a bitboard (0 if empty)."""
+    board = np.uint64(board)
+    best = _ZERO
+    for i in range(16):
+        rank = (board >> (_FOUR * np.uint64(i))) & _NIBBLE_MASK
+        if rank > best:
+            best = rank
+    return best
+
+
+@njit(cache=True, nogil=True)
+def has_valid_moves(board):
+    """Check if any move would change a bitboard."""
+    board = np.uint64(board)
+    if empty_mask(board) != _ZERO:
+        return True
+    # With no empty cells, a zero nibble in board ^ shifted board marks two
+    # equal neighbours. Mask out the last column (last row) which would
+    # otherwise be compared against the next row (nothing). 32768s never
+    # merge, so pairs of 0xF nibbles do not count.
+    mergeable = ~empty_mask(~board)
+    horizontal = empty_mask(board ^ (board >> _FOUR)) & _HORIZ_PAIRS & mergeable
+    vertical = empty_mask(board ^ (board >> _SIXTEEN)) & _VERT_PAIRS & mergeable
+    return horizontal != _ZERO or vertical != _ZERO
+
+
+@njit(cache=True, nogil=True)
+def zobrist_hash(board):
+    """Compute the Zobrist hash of a bitboard from scratch."""
+    board = np.uint64(board)
+    h = _ZERO
+    for i in range(16):
+        h ^= ZOBRIST[i, (board >> (_FOUR * np.uint64(i))) & _NIBBLE_MASK]
+    return h
+
+
+@njit(cache=True, nogil=True)
+def zobrist_update(h, old_board, new_board):
+    """
+    Incrementally update a Zobrist hash after a board change.
+
+    Args:
+        h: Zobrist hash of old_board
+        old_board: Bitboard before the change
+        new_board: Bitboard after the change
+
+    Returns:
+        Zobrist hash of new_board
+    """
+    h = np.uint64(h)
+    old_board = np.uint64(old_board)
+    new_board = np.uint64(new_board)
+    diff = old_board ^ new_board
+    for i in range(16):
+        shift = _FOUR * np.uint64(i)
+        if (diff >> shift) & _NIBBLE_MASK:
+            h ^= ZOBRIST[i, (old_board >> shift) & _NIBBLE_MASK]
+            h ^= ZOBRIST[i, (new_board >> shift) & _NIBBLE_MASK]
+    return h
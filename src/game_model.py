@@ -1,9 +1,29 @@
+import array
 import json
 import os
-from typing import List, Optional, Tuple
+import random
+import threading
+from typing import Optional
 
 import numpy as np
 
+from src.game_kernels import (
+    DOWN,
+    LEFT,
+    RIGHT,
+    UP,
+    apply_move,
+    count_empty,
+    has_valid_moves,
+    max_rank,
+    spawn_tile,
+    zobrist_hash,
+    zobrist_update,
+)
+
+# Number of moves that can be undone
+MAX_UNDO = 1024
+
 
 class GameModel:
     """
@@ -11,22 +31,46 @@ class GameModel:
     Maintains game state, performs moves, merges, and score tracking.
     """
 
-    def __init__(self, size: int = 4, high_score_file: str = "high_score.json"):
+    # Direction names accepted by move(), mapped to kernel direction codes
+    _DIRECTIONS = {"LEFT": LEFT, "RIGHT": RIGHT, "UP": UP, "DOWN": DOWN}
+
+    def __init__(
+        self,
+        size: int = 4,
+        high_score_file: str = "high_score.json",
+        seed: Optional[int] = None,
+    ):
         """
         Initialize the game model.
 
         Args:
             size: Grid size (default 4x4)
             high_score_file: Path to store high scores
+            seed: Optional seed for reproducible tile spawning
         """
+        if size != 4:
+            raise ValueError("GameModel only supports a 4x4 grid")
+
         self.size = size
-        self.grid = np.zeros((size, size), dtype=int)
+        # Bitboard: 16 nibbles, each holding log2 of the tile value (0 = empty).
+        # Row i occupies bits 16*i..16*i+15, column j is nibble j of its row.
+        self.board = 0
+        # Zobrist hash of self.board, maintained incrementally
+        self.hash64 = 0
         self.score = 0
         self.high_score = 0
         self.high_score_file = high_score_file
         self.game_over = False
         self.won = False
-        self.move_history = []  # For undo functionality
+        # Alternating board, score snapshots for undo functionality
+        self.move_history = array.array("Q")
+        # get_state() result, rebuilt only after the game state changes
+        self._state: dict = {}
+        self._state_dirty = True
+        self._rng = random.Random(seed)
+        # High score writes happen off the move path, one at a time
+        self._hs_dirty = False
+        self._hs_lock = threading.Lock()
 
         self._load_high_score()
         self._spawn_initial_tiles()
@@ -39,58 +83,11 @@ class GameModel:
 
     def _spawn_tile(self) -> None:
         """Spawn a single random tile (90% chance 2, 10% chance 4)."""
-        empty_cells = np.argwhere(self.grid == 0)
-        if len(empty_cells) > 0:
-            row, col = empty_cells[np.random.randint(len(empty_cells))]
-            value = 4 if np.random.random() < 0.1 else 2
-            self.grid[row, col] = value
-
-
-    def _move_line_left(self, line: np.ndarray) -> Tuple[np.ndarray, int]:
-        """
-        Compress and merge a single line to the left.
-
-        Args:
-            line: 1D array representing a row or column
-
-        Returns:
-            Tuple of (modified line, score gained from this move)
-        """
-        # Remove zeros and compress
-        non_zero = line[line != 0]
-
-        # Merge adjacent equal values (only once per move)
-        merged = []
-        skip = False
-        score = 0
-
-        for i in range(len(non_zero)):
-            if skip:
-                skip = False
-                continue
-
-            if i + 1 < len(non_zero) and non_zero[i] == non_zero[i + 1]:
-                merged_value = non_zero[i] * 2
-                merged.append(merged_value)
-                score += merged_value
-                skip = True
-            else:
-                merged.append(non_zero[i])
-
-        # Pad with zeros to maintain size
-        merged = np.array(merged, dtype=int)
-        padded = np.zeros(len(line), dtype=int)
-        padded[: len(merged)] = merged
-
-        return padded, score
-
-    def _rotate_grid_clockwise(self, grid: np.ndarray) -> np.ndarray:
-        """Rotate grid 90 degrees clockwise."""
-        return np.rot90(grid, k=-1)
-
-    def _rotate_grid_counterclockwise(self, grid: np.ndarray) -> np.ndarray:
-        """Rotate grid 90 degrees counterclockwise."""
-        return np.rot90(grid, k=1)
+        empty_cells = count_empty(np.uint64(self.board))
+        if empty_cells > 0:
+            index = self._rng.randrange(empty_cells)
+            rank = 2 if self._rng.random() < 0.1 else 1
+            self._set_board(spawn_tile(np.uint64(self.board), index, rank))
 
 
     def move(self, direction: str) -> bool:
@@ -106,140 +103,129 @@ class GameModel:
         if self.game_over or self.won:
             return False
 
-        # Store previous state for comparison
-        previous_grid = self.grid.copy()
-        previous_score = self.score
-
-        # Save to history for undo
-        self.move_history.append(
-            {"grid": previous_grid.copy(), "score": previous_score}
-        )
-
-        direction = direction.upper()
-
-        if direction == "LEFT":
-            self._move_left()
-        elif direction == "RIGHT":
-            self._move_right()
-        elif direction == "UP":
-            self._move_up()
-        elif direction == "DOWN":
-            self._move_down()
-        else:
-            self.move_history.pop()
+        direction_id = self._DIRECTIONS.get(direction.upper())
+        if direction_id is None:
             return False
 
-        # Check if the grid actually changed
-        moved = not np.array_equal(self.grid, previous_grid)
-
-        if moved:
-            self._spawn_tile()
-            self._check_game_state()
-        else:
-            # Undo the move if nothing changed
-            self.move_history.pop()
+        # Compute the new board first, so invalid moves leave no trace
+        board, score = apply_move(np.uint64(self.board), direction_id)
+        board = int(board)
+        if board == self.board:
+            return False
 
-        return moved
+        # Save to history for undo, forgetting the oldest move once full
+        self.move_history.append(self.board)
+        self.move_history.append(self.score)
+        if len(self.move_history) > 2 * MAX_UNDO:
+            del self.move_history[:2]
 
-    def _move_left(self) -> None:
-        """Move tiles left."""
-        for i in range(self.size):
-            new_line, score = self._move_line_left(self.grid[i, :])
-            self.grid[i, :] = new_line
-            self.score += score
-
-    def _move_right(self) -> None:
-        """Move tiles right."""
-        for i in range(self.size):
-            reversed_line = self.grid[i, ::-1]
-            new_line, score = self._move_line_left(reversed_line)
-            self.grid[i, :] = new_line[::-1]
-            self.score += score
-
-    def _move_up(self) -> None:
-        """Move tiles up."""
-        for j in range(self.size):
-            column = self.grid[:, j]
-            new_column, score = self._move_line_left(column)
-            self.grid[:, j] = new_column
-            self.score += score
-
-    def _move_down(self) -> None:
-        """Move tiles down."""
-        for j in range(self.size):
-            column = self.grid[:, j]
-            reversed_column = column[::-1]
-            new_column, score = self._move_line_left(reversed_column)
-            self.grid[:, j] = new_column[::-1]
-            self.score += score
+        self._set_board(board)
+        self.score += int(score)
+        self._spawn_tile()
+        self._check_game_state()
+        self._state_dirty = True
+        if self._hs_dirty:
+            self._hs_dirty = False
+            threading.Thread(target=self._save_high_score, daemon=True).start()
+
+        return True
+
+    def _set_board(self, board: int) -> None:
+        """Replace the board, updating its hash from the changed cells."""
+        self.hash64 = int(
+            zobrist_update(
+                np.uint64(self.hash64), np.uint64(self.board), np.uint64(board)
+            )
+        )
+        self.board = int(board)
 
 
     def _check_game_state(self) -> None:
         """Check for win or game over conditions."""
         # Check for win (2048 tile exists)
-        if np.max(self.grid) >= 2048 and not self.won:
+        if max_rank(np.uint64(self.board)) >= 11 and not self.won:
             self.won = True
             if self.score > self.high_score:
                 self.high_score = self.score
-                self._save_high_score()
+                self._hs_dirty = True
 
         # Check for possible moves
         if not self._has_valid_moves():
             self.game_over = True
             if self.score > self.high_score:
                 self.high_score = self.score
-                self._save_high_score()
+                self._hs_dirty = True
 
     def _has_valid_moves(self) -> bool:
         """Check if any valid moves remain."""
-        # Check for empty cells
-        if np.any(self.grid == 0):
-            return True
-
-        # Check for possible merges
-        for i in range(self.size):
-            for j in range(self.size):
-                current = self.grid[i, j]
-                # Check right neighbor
-                if j < self.size - 1 and current == self.grid[i, j + 1]:
-                    return True
-                # Check down neighbor
-                if i < self.size - 1 and current == self.grid[i + 1, j]:
-                    return True
-
-        return False
+        return bool(has_valid_moves(np.uint64(self.board)))
 
     def undo(self) -> bool:
         """Undo the last move."""
         if len(self.move_history) > 0:
-            state = self.move_history.pop()
-            self.grid = state["grid"]
-            self.score = state["score"]
+            self.score = self.move_history.pop()
+            self.board = self.move_history.pop()
+            self.hash64 = int(zobrist_hash(np.uint64(self.board)))
+            self._state_dirty = True
             return True
         return False
 
-    def reset(self) -> None:
-        """Reset the game to initial state."""
-        self.grid = np.zeros((self.size, self.size), dtype=int)
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Reset the game to initial state.
+
+        Args:
+            seed: Optional seed to restart the tile spawn sequence with
+        """
+        if seed is not None:
+            self._rng.seed(seed)
+        self.board = 0
+        self.hash64 = 0
         self.score = 0
         self.game_over = False
         self.won = False
-        self.move_history = []
+        del self.move_history[:]
         self._spawn_initial_tiles()
+        self._state_dirty = True
+
+    def _decode_grid(self) -> np.ndarray:
+        """Decode the bitboard into a 2D array of tile values."""
+        grid = np.zeros((self.size, self.size), dtype=np.int32)
+        for i in range(self.size):
+            for j in range(self.size):
+                rank = (self.board >> (16 * i + 4 * j)) & 0xF
+                if rank:
+                    grid[i, j] = 1 << rank
+        return grid
+
+    def get_grid(self, copy: bool = True) -> np.ndarray:
+        """
+        Return the current grid of tile values.
 
-    def get_grid(self) -> np.ndarray:
-        """Return a copy of the current grid."""
-        return self.grid.copy()
+        Args:
+            copy: If False, return the array cached by get_state(), which
+                must not be modified
+        """
+        grid = self.get_state()["grid"]
+        return grid.copy() if copy else grid
 
     def get_state(self) -> dict:
-        """Return the complete game state."""
-        return {
-            "grid": self.get_grid(),
-            "score": self.score,
-            "high_score": self.high_score,
-            "game_over": self.game_over,
-            "won": self.won,
-        }
+        """
+        Return the complete game state.
+
+        The same dict is returned until the next move, undo or reset, so
+        callers should treat it as read-only.
+        """
+        if self._state_dirty:
+            self._state = {
+                "grid": self._decode_grid(),
+                "score": self.score,
+                "high_score": self.high_score,
+                "game_over": self.game_over,
+                "won": self.won,
+            }
+            self._state_dirty = False
+        return self._state
 
 
     def _load_high_score(self) -> None:
@@ -253,6 +239,9 @@ class GameModel:
                 self.high_score = 0
 
     def _save_high_score(self) -> None:
-        """Save high score to JSON file."""
-        with open(self.high_score_file, "w") as f:
-            json.dump({"high_score": int(self.high_score)}, f)
+        """Save high score to JSON file, replacing it atomically."""
+        with self._hs_lock:
+            tmp_file = self.high_score_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump({"high_score": int(self.high_score)}, f)
+            os.replace(tmp_file, self.high_score_file)
@@ -1,6 +1,12 @@
+import time
 import tkinter as tk
 from tkinter import messagebox
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional, Tuple
+
+
+def _colors_by_log2(colors: Dict[int, str], empty: str) -> Tuple[str, ...]:
+    """Flatten a value->color map into a tuple indexed by log2(value)."""
+    return (empty,) + tuple(colors.get(1 << k, colors[8192]) for k in range(1, 16))
 
 
 class GameView:
@@ -44,6 +50,13 @@ class GameView:
         8192: "#ffffff",
     }
 
+    # Minimum time between accepted moves, so held-key auto-repeat coalesces
+    MOVE_INTERVAL_NS = 25_000_000
+
+    # Colors indexed by log2 of the tile value, with index 0 for empty cells
+    TILE_COLOR_BY_LOG2 = _colors_by_log2(TILE_COLORS, "#cdc1b4")
+    TEXT_COLOR_BY_LOG2 = _colors_by_log2(TEXT_COLORS, "#000000")
+
     def __init__(self, grid_size: int = 4, cell_size: int = 100, padding: int = 10):
         """
         Initialize the game view.
@@ -71,6 +84,10 @@ class GameView:
         self.new_game_callback: Optional[Callable[[], None]] = None
         self.undo_callback: Optional[Callable[[], None]] = None
 
+        # Last value drawn in each cell, so unchanged tiles are not reconfigured
+        self._last_values = [[-1] * grid_size for _ in range(grid_size)]
+        self._last_move_ns = 0
+
         self._setup_ui()
         self._bind_keys()
 
@@ -181,26 +198,35 @@ class GameView:
         )
         self.canvas.pack(padx=10, pady=10)
 
-        # Tile labels (for displaying numbers)
-        self.tile_labels = []
+        # Tile rectangles and text items, drawn directly on the canvas
+        self.rect_ids = []
+        self.text_ids = []
         for i in range(self.grid_size):
-            row = []
+            rect_row = []
+            text_row = []
             for j in range(self.grid_size):
-                label = tk.Label(
-                    self.canvas,
-                    text="",
-                    font=("Helvetica", 24, "bold"),
-                    width=4,
-                    height=2,
+                x = j * self.cell_size + (j + 1) * self.padding
+                y = i * self.cell_size + (i + 1) * self.padding
+                rect_row.append(
+                    self.canvas.create_rectangle(
+                        x,
+                        y,
+                        x + self.cell_size,
+                        y + self.cell_size,
+                        fill="#cdc1b4",
+                        outline="",
+                    )
                 )
-                label.place(
-                    x=j * self.cell_size + (j + 1) * self.padding,
-                    y=i * self.cell_size + (i + 1) * self.padding,
-                    width=self.cell_size,
-                    height=self.cell_size,
+                text_row.append(
+                    self.canvas.create_text(
+                        x + self.cell_size / 2,
+                        y + self.cell_size / 2,
+                        text="",
+                        font=("Helvetica", 24, "bold"),
+                    )
                 )
-                row.append(label)
-            self.tile_labels.append(row)
+            self.rect_ids.append(rect_row)
+            self.text_ids.append(text_row)
 
     def _bind_keys(self) -> None:
         """Bind keyboard events for game controls."""
@@ -212,6 +238,11 @@ class GameView:
 
     def _on_move(self, direction: str) -> None:
         """Handle movement key press."""
+        now = time.monotonic_ns()
+        if now - self._last_move_ns < self.MOVE_INTERVAL_NS:
+            return
+        self._last_move_ns = now
+
         if self.move_callback:
             self.move_callback(direction)
 
@@ -232,21 +263,28 @@ class GameView:
         Args:
             grid: 2D list or numpy array of tile values
         """
+        changed = False
         for i in range(self.grid_size):
             for j in range(self.grid_size):
                 value = int(grid[i][j])
-                label = self.tile_labels[i][j]
-
-                if value == 0:
-                    label.config(text="", bg="#cdc1b4", fg="#000000")
-                else:
-                    label.config(text=str(value))
-
-                    # Get appropriate colors
-                    bg_color = self.TILE_COLORS.get(value, self.TILE_COLORS[8192])
-                    fg_color = self.TEXT_COLORS.get(value, self.TEXT_COLORS[8192])
+                if value == self._last_values[i][j]:
+                    continue
+                self._last_values[i][j] = value
+                changed = True
+
+                # Tile values are powers of two, so bit_length - 1 is log2
+                k = value.bit_length() - 1 if value else 0
+                self.canvas.itemconfigure(
+                    self.rect_ids[i][j], fill=self.TILE_COLOR_BY_LOG2[k]
+                )
+                self.canvas.itemconfigure(
+                    self.text_ids[i][j],
+                    text=str(value) if value else "",
+                    fill=self.TEXT_COLOR_BY_LOG2[k],
+                )
 
-                    label.config(bg=bg_color, fg=fg_color)
+        if changed:
+            self.canvas.update_idletasks()
 
     def update_score(self, score: int, high_score: int) -> None:
         """
@@ -0,0 +1,136 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.game_kernels import (
+    DOWN,
+    LEFT,
+    LEFT_ROW,
+    LEFT_SCORE,
+    RIGHT,
+    RIGHT_ROW,
+    RIGHT_SCORE,
+    UP,
+    apply_move,
+    has_valid_moves,
+)
+from src.game_model import GameModel
+
+
+def encode(grid):
+    """Pack a 4x4 grid of tile values into a bitboard."""
+    board = 0
+    for i in range(4):
+        for j in range(4):
+            if grid[i][j]:
+                board |= (int(grid[i][j]).bit_length() - 1) << (16 * i + 4 * j)
+    return board
+
+
+def merge_left(ranks):
+    """Scalar reference merge of one row of ranks, as in the original model."""
+    non_zero = [rank for rank in ranks if rank]
+    merged = []
+    score = 0
+    i = 0
+    while i < len(non_zero):
+        if (
+            i + 1 < len(non_zero)
+            and non_zero[i] == non_zero[i + 1]
+            and non_zero[i] != 0xF
+        ):
+            merged.append(non_zero[i] + 1)
+            score += 1 << (non_zero[i] + 1)
+            i += 2
+        else:
+            merged.append(non_zero[i])
+            i += 1
+    return merged + [0] * (4 - len(merged)), score
+
+
+def pack_row(ranks):
+    """Pack four ranks into a 16-bit row, column 0 in the lowest nibble."""
+    return sum(rank << (4 * j) for j, rank in enumerate(ranks))
+
+
+START = [
+    [2, 2, 4, 0],
+    [0, 4, 4, 4],
+    [2, 0, 2, 0],
+    [8, 8, 8, 8],
+]
+
+
+@pytest.mark.parametrize(
+    "direction, expected, score",
+    [
+        (LEFT, [[4, 4, 0, 0], [8, 4, 0, 0], [4, 0, 0, 0], [16, 16, 0, 0]], 48),
+        (RIGHT, [[0, 0, 4, 4], [0, 0, 4, 8], [0, 0, 0, 4], [0, 0, 16, 16]], 48),
+        (UP, [[4, 2, 8, 4], [8, 4, 2, 8], [0, 8, 8, 0], [0, 0, 0, 0]], 12),
+        (DOWN, [[0, 0, 0, 0], [0, 2, 8, 0], [4, 4, 2, 4], [8, 8, 8, 8]], 12),
+    ],
+)
+def test_apply_move_known_board(direction, expected, score):
+    board, gained = apply_move(np.uint64(encode(START)), direction)
+    assert board == encode(expected)
+    assert gained == score
+
+
+def test_get_grid_decodes_board(tmp_path):
+    model = GameModel(high_score_file=str(tmp_path / "high_score.json"))
+    model.board = encode(START)
+    model._state_dirty = True
+    assert model.get_grid().tolist() == START
+
+
+def test_move_tables_match_scalar_merge():
+    for row in range(65536):
+        ranks = [(row >> (4 * j)) & 0xF for j in range(4)]
+
+        merged, score = merge_left(ranks)
+        assert LEFT_ROW[row] == pack_row(merged)
+        assert LEFT_SCORE[row] == score
+
+        merged, score = merge_left(ranks[::-1])
+        assert RIGHT_ROW[row] == pack_row(merged[::-1])
+        assert RIGHT_SCORE[row] == score
+
+
+def has_valid_moves_loop(board):
+    """Reference check using the original empty-cell and neighbour loop."""
+    rank = [[(board >> (16 * i + 4 * j)) & 0xF for j in range(4)] for i in range(4)]
+    if any(rank[i][j] == 0 for i in range(4) for j in range(4)):
+        return True
+    for i in range(4):
+        for j in range(4):
+            # 32768s cannot merge, so a pair of them is not a move
+            if rank[i][j] == 0xF:
+                continue
+            if j < 3 and rank[i][j] == rank[i][j + 1]:
+                return True
+            if i < 3 and rank[i][j] == rank[i + 1][j]:
+                return True
+    return False
+
+
+def test_has_valid_moves_matches_neighbour_loop():
+    rng = random.Random(0)
+    for _ in range(20000):
+        # Mostly full boards with few distinct ranks, so merges are common
+        top = rng.choice((3, 15))
+        board = 0
+        for cell in range(16):
+            low = 0 if rng.random() < 0.05 else 1
+            board |= rng.randint(low, top) << (4 * cell)
+        assert bool(has_valid_moves(np.uint64(board))) == has_valid_moves_loop(board)
+
+
+def test_has_valid_moves_ignores_32768_pairs():
+    grid = [
+        [32768, 32768, 2, 4],
+        [2, 4, 8, 16],
+        [4, 8, 16, 32],
+        [8, 16, 32, 64],
+    ]
+    assert not has_valid_moves(np.uint64(encode(grid)))